@@ -1,223 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from bson.objectid import ObjectId
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 
-from app.auth.auth_bearer import JWTBearer
+from app.auth.auth_bearer import jwt_bearer
 from app.auth.security import authorize
-from app.core.logger import CustomLogger
+from app.core.constants import CREDENTIAL_PAGE_LIMIT, MAX_CREDENTIAL_PAGE_LIMIT
+from app.core.util import to_object_id
 from app.schemas.credentialSchema import Credential
-from app.services.credential_service import CredentialService
+from app.services.credential_service import CredentialService, get_credential_service
 
 router = APIRouter()
-credential_service = CredentialService()
 
-logger = CustomLogger("credential")
+
+def valid_credential_id(credential_id: str) -> ObjectId:
+    """
+    Parse the credential_id path parameter once at the router boundary.
+
+    Args:
+        credential_id (str): The credential ID from the path.
+
+    Returns:
+        ObjectId: The parsed credential ID.
+
+    Raises:
+        HTTPException(400): If the ID is malformed.
+    """
+    return to_object_id(credential_id)
+
+
+async def authorized_user_id(
+    user_id: str,
+    user: dict = Depends(jwt_bearer),
+    credential_service: CredentialService = Depends(get_credential_service),
+) -> ObjectId:
+    """
+    Authorise the caller for the user_id path parameter and check the user exists.
+
+    FastAPI caches dependency results per request, so this runs once per
+    request however many dependants ask for it.
+
+    Args:
+        user_id (str): The user ID from the path.
+        user (dict): Authenticated user data, injected by JWTBearer.
+        credential_service (CredentialService): The shared credential service.
+
+    Returns:
+        ObjectId: The parsed ID of the existing user.
+
+    Raises:
+        HTTPException(400): If the ID is malformed.
+        HTTPException(401): If the authenticated user is not authorized.
+        HTTPException(404): If the user does not exist.
+    """
+    authorize(user_id, user)
+    user_data = await credential_service.get_user_data(user_id)
+    return user_data["_id"]
 
 
 @router.post("/{user_id}/user")
 async def create_credential(
-    user_id: str, credential: Credential, user: dict = Depends(JWTBearer())
+    credential: Credential,
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
     Create a new credential for a specific user.
 
     Args:
-        user_id (str): The ID of the user for whom the credential is being created.
         credential (Credential): The credential data from the request body.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user for whom the credential is being created.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
         str: The ID of the created credential.
 
     Raises:
         HTTPException(403): If the authenticated user is not authorized.
+        HTTPException(404): If the user does not exist.
         HTTPException(500): If any other error occurs during creation.
     """
-    try:
-        authorize(user_id, user)
-        return credential_service.create_credential(user_id, credential)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating credential: {e}")
-        raise HTTPException(status_code=500, detail=f"Error creating credential: {e}")
+    return await credential_service.create_credential(user_id, credential)
 
 
 @router.get("/{user_id}/user/{credential_id}")
 async def get_credential(
-    user_id: str, credential_id: str, user: dict = Depends(JWTBearer())
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_id: ObjectId = Depends(valid_credential_id),
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
     Retrieve a specific credential by its ID for a user.
 
     Args:
-        user_id (str): The ID of the user who owns the credential.
-        credential_id (str): The ID of the credential to retrieve.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user who owns the credential.
+        credential_id (ObjectId): The ID of the credential to retrieve.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
         dict: Credential data if found.
 
     Raises:
+        HTTPException(400): If the credential ID is malformed.
         HTTPException(403): If the authenticated user is not authorized.
-        HTTPException(404): If the credential is not found.
+        HTTPException(404): If the user or the credential is not found.
         HTTPException(500): If any other error occurs.
     """
-    try:
-        authorize(user_id, user)
-        credential = credential_service.get_credential_by_id(user_id, credential_id)
-        if not credential:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Credential not found for credential_id: {credential_id}",
-            )
-        return credential
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting credential: {e}")
-        raise HTTPException(status_code=500, detail=f"Error getting credential: {e}")
+    credential = await credential_service.get_credential_by_id(user_id, credential_id)
+    if not credential:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Credential not found for credential_id: {credential_id}",
+        )
+    return credential
 
 
 @router.get("/{user_id}/user/{title}/title")
 async def get_credential_by_title(
-    user_id: str, title: str, user: dict = Depends(JWTBearer())
+    title: str,
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
     Retrieve a credential by its title for a user.
 
     Args:
-        user_id (str): The ID of the user who owns the credential.
         title (str): The title of the credential.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user who owns the credential.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
         dict: Credential data if found.
 
     Raises:
         HTTPException(403): If the authenticated user is not authorized.
-        HTTPException(404): If the credential is not found.
+        HTTPException(404): If the user or the credential is not found.
         HTTPException(500): If any other error occurs.
     """
-    try:
-        authorize(user_id, user)
-        credential = credential_service.get_credential_by_title(user_id, title)
-        if not credential:
-            raise HTTPException(
-                status_code=404, detail=f"Credential not found for title: {title}"
-            )
-        return credential
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting credential by title: {e}")
+    credential = await credential_service.get_credential_by_title(user_id, title)
+    if not credential:
         raise HTTPException(
-            status_code=500, detail=f"Error getting credential by title: {e}"
+            status_code=404, detail=f"Credential not found for title: {title}"
         )
+    return credential
+
+
+@router.post("/{user_id}/user/batch")
+async def get_credentials_by_ids(
+    credential_ids: list[str] = Body(..., max_length=MAX_CREDENTIAL_PAGE_LIMIT),
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_service: CredentialService = Depends(get_credential_service),
+):
+    """
+    Retrieve several credentials of a user by ID in a single request.
+
+    Args:
+        credential_ids (list[str]): The credential IDs, as a JSON array body.
+        user_id (ObjectId): The ID of the user who owns the credentials.
+        credential_service (CredentialService): The shared credential service.
+
+    Returns:
+        list: The credentials in request order, with null for IDs that were
+            not found.
+
+    Raises:
+        HTTPException(400): If any credential ID is malformed.
+        HTTPException(403): If the authenticated user is not authorized.
+        HTTPException(404): If the user does not exist.
+        HTTPException(422): If more than MAX_CREDENTIAL_PAGE_LIMIT IDs are sent.
+        HTTPException(500): If any other error occurs.
+    """
+    return await credential_service.get_credentials_by_ids(user_id, credential_ids)
 
 
 @router.get("/{user_id}/user")
 async def get_all_credentials(
-    request: Request, user_id: str, user: dict = Depends(JWTBearer())
+    user_id: ObjectId = Depends(authorized_user_id),
+    search: str | None = None,
+    limit: int = Query(CREDENTIAL_PAGE_LIMIT, ge=1, le=MAX_CREDENTIAL_PAGE_LIMIT),
+    after: str | None = None,
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
-    Retrieve all credentials for a specific user.
+    Retrieve a page of credentials for a specific user.
 
     Args:
-        user_id (str): The ID of the user whose credentials are being retrieved.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user whose credentials are being retrieved.
+        search (str, optional): Prefix to match against title or username.
+        limit (int): The maximum number of credentials to return.
+        after (str, optional): The ID of the last credential of the previous page.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
-        list: A list of all credentials for the user.
+        list: A list of credentials for the user.
 
     Raises:
+        HTTPException(400): If ``after`` is not a valid credential ID.
         HTTPException(403): If the authenticated user is not authorized.
+        HTTPException(404): If the user does not exist.
         HTTPException(500): If any other error occurs.
     """
-    try:
-        authorize(user_id, user)
-        search_value = request.query_params.get("search", None)
-        return credential_service.get_all_credentials(user_id, search_value)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting all credentials: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error getting all credentials: {e}"
-        )
+    return await credential_service.get_all_credentials(
+        user_id, search, limit, to_object_id(after) if after else None
+    )
 
 
 @router.put("/{user_id}/user/{credential_id}/update")
 async def update_credential(
-    user_id: str,
-    credential_id: str,
     credential: Credential,
-    user: dict = Depends(JWTBearer()),
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_id: ObjectId = Depends(valid_credential_id),
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
     Update an existing credential for a specific user.
 
     Args:
-        user_id (str): The ID of the user who owns the credential.
-        credential_id (str): The ID of the credential to update.
         credential (Credential): The updated credential data.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user who owns the credential.
+        credential_id (ObjectId): The ID of the credential to update.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
         dict: The updated credential data.
 
     Raises:
+        HTTPException(400): If the credential ID is malformed.
         HTTPException(403): If the authenticated user is not authorized.
-        HTTPException(404): If the credential is not found.
+        HTTPException(404): If the user or the credential is not found.
         HTTPException(500): If any other error occurs.
     """
-    try:
-        authorize(user_id, user)
-        credential_data = credential_service.update_credential(
-            user_id, credential_id, credential
+    credential_data = await credential_service.update_credential(
+        user_id, credential_id, credential
+    )
+    if not credential_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Credential not found for credential_id: {credential_id}",
         )
-        if not credential_data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Credential not found for credential_id: {credential_id}",
-            )
-        return credential_data
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating credential: {e}")
-        raise HTTPException(status_code=500, detail=f"Error updating credential: {e}")
+    return credential_data
 
 
 @router.delete("/{user_id}/user/{credential_id}/delete")
 async def delete_credential(
-    user_id: str, credential_id: str, user: dict = Depends(JWTBearer())
+    user_id: ObjectId = Depends(authorized_user_id),
+    credential_id: ObjectId = Depends(valid_credential_id),
+    credential_service: CredentialService = Depends(get_credential_service),
 ):
     """
     Soft delete a credential for a specific user.
 
     Args:
-        user_id (str): The ID of the user who owns the credential.
-        credential_id (str): The ID of the credential to delete.
-        user (dict): Authenticated user data, injected by JWTBearer.
+        user_id (ObjectId): The ID of the user who owns the credential.
+        credential_id (ObjectId): The ID of the credential to delete.
+        credential_service (CredentialService): The shared credential service.
 
     Returns:
         dict: The deletion operation result.
 
     Raises:
+        HTTPException(400): If the credential ID is malformed.
         HTTPException(403): If the authenticated user is not authorized.
-        HTTPException(404): If the credential is not found.
+        HTTPException(404): If the user or the credential is not found.
         HTTPException(500): If any other error occurs.
     """
-    try:
-        authorize(user_id, user)
-        credential_data = credential_service.delete_credential(user_id, credential_id)
-        if not credential_data:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Credential not found for credential_id: {credential_id}",
-            )
-        return credential_data
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting credential: {e}")
-        raise HTTPException(status_code=500, detail=f"Error deleting credential: {e}")
+    credential_data = await credential_service.delete_credential(user_id, credential_id)
+    if not credential_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Credential not found for credential_id: {credential_id}",
+        )
+    return credential_data
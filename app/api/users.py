@@ -5,28 +5,37 @@ This module contains all the user-related API endpoints including
 CRUD operations, authentication, and user management functionality.
 """
 
-import traceback
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 
-from app.auth.auth_bearer import JWTBearer
+from app.auth.auth_bearer import jwt_bearer
 from app.auth.security import (
     authorize,
     create_access_token,
-    verify_password,
+    verify_password_async,
     verify_token,
 )
-from app.core.logger import CustomLogger
-from app.core.util import get_params
-from app.models.user import user_data
+from app.core.constants import (
+    ID_FIELD,
+    MAX_USER_PAGE_LIMIT,
+    SORT_TYPE_ASC,
+    USER_PAGE_LIMIT,
+    SortType,
+)
+from app.models.user import LOGIN_PROJECTION, user_data
 from app.schemas.token import Token
 from app.schemas.userSchema import UpdateUser, User, UserLogin, UserResponse
-from app.services.user_service import UserService, get_user, is_duplicate_username
+from app.services.user_service import (
+    UserService,
+    get_user,
+    get_user_service,
+    is_duplicate_username,
+)
 
-logger = CustomLogger("users")
+logger = logging.getLogger(__name__)
 router = APIRouter()
-user_service = UserService()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
@@ -50,12 +59,16 @@ def get_current_user(token: str):
 
 
 @router.post("")
-async def create_user(user: User = Depends(is_duplicate_username)) -> dict:
+async def create_user(
+    user: User = Depends(is_duplicate_username),
+    user_service: UserService = Depends(get_user_service),
+) -> dict:
     """
     Create a new user.
 
     Args:
         user (User): The user object, validated for duplicate username.
+        user_service (UserService): The shared user service.
 
     Returns:
         dict: Status code and created user data.
@@ -63,43 +76,66 @@ async def create_user(user: User = Depends(is_duplicate_username)) -> dict:
     Raises:
         HTTPException: If an error occurs during user creation.
     """
-    try:
-        response = user_service.create_user(user)
-        logger.info("User created successfully")
-        return {"status_code": 200, "data": response}
-    except Exception as e:
-        logger.error(f"Unknown error occure while creating user: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Exception occur while creating user: {e}"
-        )
+    response = await user_service.create_user(user)
+    logger.info("User created successfully")
+    return {"status_code": 200, "data": response}
 
 
-@router.get("", dependencies=[Depends(JWTBearer())])
+@router.get("", dependencies=[Depends(jwt_bearer)])
 async def get_all_user(
-    request: Request,
+    sort_by: str = ID_FIELD,
+    sort_type: SortType = SORT_TYPE_ASC,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(USER_PAGE_LIMIT, ge=1, le=MAX_USER_PAGE_LIMIT),
+    username: str | None = None,
+    name: str | None = None,
+    email_id: str | None = None,
+    date_of_birth: str | None = None,
+    id: str | None = None,
+    user_service: UserService = Depends(get_user_service),
 ) -> list[dict]:
     """
-    Retrieve all users.
+    Retrieve a page of users, optionally filtered by exact field values.
 
     Args:
-        current_user (dict): The current authenticated user.
+        sort_by (str): The field to sort by.
+        sort_type (str): The sort order, "asc" or "desc".
+        skip (int): The number of matching users to skip.
+        limit (int): The maximum number of users to return.
+        username (str, optional): Only return users with this username.
+        name (str, optional): Only return users with this name.
+        email_id (str, optional): Only return users with this email.
+        date_of_birth (str, optional): Only return users with this date of birth.
+        id (str, optional): Only return the user with this ID.
+        user_service (UserService): The shared user service.
 
     Returns:
         list[dict]: List of user data.
     """
-    print(request.client.host)
-    sort_by, sort_type, filter_params = get_params(dict(request.query_params))
-    return user_service.get_users(sort_by, sort_type, filter_params)
+    filters = {
+        "username": username,
+        "name": name,
+        "email_id": email_id,
+        "date_of_birth": date_of_birth,
+        ID_FIELD: id,
+    }
+    filter_params = {field: value for field, value in filters.items() if value}
+    return await user_service.get_users(sort_by, sort_type, filter_params, skip, limit)
 
 
 @router.get(path="/{id}/user", response_model=UserResponse)
-async def get_user_by_id(id: str, current_user: dict = Depends(JWTBearer())) -> dict:
+async def get_user_by_id(
+    id: str,
+    current_user: dict = Depends(jwt_bearer),
+    user_service: UserService = Depends(get_user_service),
+) -> dict:
     """
     Retrieve a user by their ID.
 
     Args:
         id (str): The user's ID.
         current_user (dict): The current authenticated user.
+        user_service (UserService): The shared user service.
 
     Returns:
         dict: Status code and user data.
@@ -107,26 +143,21 @@ async def get_user_by_id(id: str, current_user: dict = Depends(JWTBearer())) ->
     Raises:
         HTTPException: If user is not found or an error occurs.
     """
-    try:
-        authorize(id, current_user)
-        user = user_service.get_user_by_id(id)
-        if not user:
-            logger.error(f"User not found for user id: {id}")
-            raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
-        logger.info(f"User successfully fetched for user id: {id}")
-        return user
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unknown error occure while fetching user: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Exception occur while updating user: {e}"
-        )
+    authorize(id, current_user)
+    user = await user_service.get_user_by_id(id)
+    if not user:
+        logger.error("User not found for user id: %s", id)
+        raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
+    logger.info("User successfully fetched for user id: %s", id)
+    return user
 
 
 @router.put("/{id}/update")
 async def update_user_by_id(
-    id: str, user: UpdateUser, current_user: dict = Depends(JWTBearer())
+    id: str,
+    user: UpdateUser,
+    current_user: dict = Depends(jwt_bearer),
+    user_service: UserService = Depends(get_user_service),
 ):
     """
     Update a user by their ID.
@@ -135,6 +166,7 @@ async def update_user_by_id(
         id (str): The user's ID.
         user (User): The updated user object.
         current_user (dict): The current authenticated user.
+        user_service (UserService): The shared user service.
 
     Returns:
         dict: Status code and update message.
@@ -142,32 +174,27 @@ async def update_user_by_id(
     Raises:
         HTTPException: If user is not found or an error occurs.
     """
-    try:
-        authorize(id, current_user)
-        user_data = user_service.update_user_by_id(id, user)
-        if not user_data:
-            logger.error(f"User not found for user id: {id}")
-            raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
-        return {"status_code": 200, "message": "User updated successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(
-            f"Unknown error occure while updating user: {traceback.format_exc()}"
-        )
-        raise HTTPException(
-            status_code=500, detail=f"Exception occur while updating user: {e}"
-        )
+    authorize(id, current_user)
+    user_data = await user_service.update_user_by_id(id, user)
+    if not user_data:
+        logger.error("User not found for user id: %s", id)
+        raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
+    return {"status_code": 200, "message": "User updated successfully"}
 
 
 @router.delete("/{id}/delete")
-async def delete_user_by_id(id: str, current_user: dict = Depends(JWTBearer())):
+async def delete_user_by_id(
+    id: str,
+    current_user: dict = Depends(jwt_bearer),
+    user_service: UserService = Depends(get_user_service),
+):
     """
     Delete a user by their ID.
 
     Args:
         id (str): The user's ID.
         current_user (dict): The current authenticated user.
+        user_service (UserService): The shared user service.
 
     Returns:
         dict: Status code and deletion message.
@@ -175,20 +202,12 @@ async def delete_user_by_id(id: str, current_user: dict = Depends(JWTBearer())):
     Raises:
         HTTPException: If user is not found or an error occurs.
     """
-    try:
-        authorize(id, current_user)
-        user_data = user_service.delete_user_by_id(id)
-        if not user_data:
-            logger.error(f"User not found for user id: {id}")
-            raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
-        return {"status_code": 200, "message": "User deleted successfully"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unknown error occure while daleting user: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Exception occur while updating user: {e}"
-        )
+    authorize(id, current_user)
+    user_data = await user_service.delete_user_by_id(id)
+    if not user_data:
+        logger.error("User not found for user id: %s", id)
+        raise HTTPException(status_code=404, detail=f"User not found for id: {id}")
+    return {"status_code": 200, "message": "User deleted successfully"}
 
 
 @router.post("/login", response_model=Token)
@@ -205,17 +224,17 @@ async def login(form_data: UserLogin):
     Raises:
         HTTPException: If credentials are invalid or password is incorrect.
     """
-    user = get_user(**{"username": form_data.username})
+    user = await get_user({"username": form_data.username}, LOGIN_PROJECTION)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    if not verify_password(form_data.password, user.get("password")):
+    if not await verify_password_async(form_data.password, user.get("password")):
         raise HTTPException(status_code=401, detail="Incorrect password")
     token = create_access_token(user_data(user))
     return {"access_token": token, "token_type": "bearer"}
 
 
 @router.get("/me")
-async def me(user: dict = Depends(JWTBearer())):
+async def me(user: dict = Depends(jwt_bearer)):
     """
     Get the current authenticated user's information.
 
@@ -22,6 +22,10 @@ class JWTBearer(HTTPBearer):
         """
         Validate the JWT token from the request authorization header.
 
+        If RateLimitMiddleware already verified the token for this request,
+        its payload is reused. The signature and expiry are still checked
+        once per request, just not twice.
+
         Args:
             request (Request): The FastAPI request object.
 
@@ -33,7 +37,14 @@ class JWTBearer(HTTPBearer):
         """
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
         if credentials:
+            payload = getattr(request.state, "jwt_payload", None)
+            if payload:
+                return payload
             payload = verify_token(credentials.credentials)
             if payload:
                 return payload
         raise HTTPException(status_code=403, detail="Invalid or expired token")
+
+
+# Shared instance so every route depends on the same callable
+jwt_bearer = JWTBearer()
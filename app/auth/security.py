@@ -5,20 +5,44 @@ This module provides functions for password hashing, JWT token creation
 and verification, and access control functionality.
 """
 
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-from app.core.constants import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
+from app.core.constants import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ALGORITHM,
+    PASSWORD_HASH_WORKERS,
+    SECRET_KEY,
+    TOKEN_CACHE_MAXSIZE,
+    TOKEN_CACHE_TTL,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2 is used for new hashes; bcrypt stays listed so existing hashes keep verifying.
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+
+# Both backends release the GIL while hashing, so a dedicated pool runs hashes
+# in parallel across cores without occupying the request threadpool. It is
+# created on first use and dropped on shutdown, so a later lifespan (tests,
+# reloads) gets a fresh pool.
+_hash_executor: ThreadPoolExecutor | None = None
+
+# Decoded token payloads keyed by the SHA-256 digest of the raw token, stored
+# as (payload, exp) so an entry is never served past the token's own expiry.
+_token_cache: TTLCache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL)
+_ALGORITHMS: list[str] = [ALGORITHM]
 
 
 def hash_password(password: str):
     """
-    Hash a plain password using bcrypt.
+    Hash a plain password using the default scheme (argon2).
 
     Args:
         password (str): The plain password.
@@ -29,6 +53,19 @@ def hash_password(password: str):
     return pwd_context.hash(password)
 
 
+def warm_up_password_context():
+    """
+    Load the hashing backend of the default scheme once.
+
+    passlib resolves each backend lazily on first use, which stalls the first
+    login or signup handled by a fresh worker. Hashing a throwaway value at
+    startup moves that cost out of the request path. Only the default scheme
+    is warmed: bcrypt is kept for legacy verifies, and its passlib backend
+    check fails against bcrypt 4.1+.
+    """
+    pwd_context.hash("warmup")
+
+
 def verify_password(plain_password: str, hashed_password: str):
     """
     Verify a plain password against a hashed password.
@@ -48,6 +85,64 @@ def verify_password(plain_password: str, hashed_password: str):
         return False
 
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Return the password hashing pool, creating it if needed.
+
+    Returns:
+        ThreadPoolExecutor: The shared hashing pool.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+
+async def hash_password_async(password: str):
+    """
+    Hash a plain password on the password hashing pool.
+
+    Args:
+        password (str): The plain password.
+
+    Returns:
+        str: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """
+    Verify a plain password against a hashed password on the hashing pool.
+
+    Args:
+        plain_password (str): The plain password.
+        hashed_password (str): The hashed password.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+def shutdown_password_executor():
+    """
+    Stop the password hashing pool, letting queued hashes finish.
+
+    The next hash after this call starts a new pool.
+    """
+    global _hash_executor
+    executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """
     Create a JWT access token.
@@ -71,35 +166,36 @@ def verify_token(token: str):
     """
     Verify and decode a JWT token.
 
+    Successfully decoded payloads are cached for a short period so repeated
+    requests with the same bearer token skip the signature check. Failed
+    validations are never cached.
+
     Args:
         token (str): The JWT token to verify.
 
     Returns:
         dict or None: The decoded payload if valid, None otherwise.
     """
-    if not token:
+    # A compact JWS always has three dot-separated segments; reject anything
+    # else before hashing or handing it to PyJWT.
+    if not token or token.count(".") != 2:
         return None
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    cached = _token_cache.get(key)
+    if cached:
+        payload, exp = cached
+        if exp > now:
+            return payload
+        _token_cache.pop(key, None)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=_ALGORITHMS)
+    except jwt.PyJWTError:
         return None
-
-
-def allow_access(id, current_user):
-    """
-    Check if the current user is allowed to access the resource.
-
-    Args:
-        id (str): The resource/user id.
-        current_user (dict): The current authenticated user.
-
-    Returns:
-        bool: True if access is allowed, False otherwise.
-    """
-    if id != current_user.get("id", ""):
-        return False
-    return True
+    exp = payload.get("exp")
+    if exp is not None and exp > now:
+        _token_cache[key] = (payload, exp)
+    return payload
 
 
 def authorize(id, current_user):
@@ -116,6 +212,6 @@ def authorize(id, current_user):
     Raises:
         HTTPException: If the user is not authorized.
     """
-    if not allow_access(id, current_user):
+    if id != current_user.get("id"):
         raise HTTPException(status_code=401, detail="Unauthorised action")
     return current_user
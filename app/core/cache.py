@@ -0,0 +1,89 @@
+"""
+In-process caches shared between repositories and services.
+
+Entries are short-lived and per worker; writers invalidate the keys they
+touch so staleness is bounded by the TTL only across workers.
+"""
+
+from cachetools import TTLCache
+
+from app.core.constants import (
+    READ_CACHE_MAXSIZE,
+    READ_CACHE_TTL,
+    USER_EXISTS_CACHE_MAXSIZE,
+    USER_EXISTS_CACHE_TTL,
+)
+
+
+class ReadCache(TTLCache):
+    """
+    TTLCache that lets readers detect invalidations made during a fetch.
+
+    A reader takes ``invalidations`` before awaiting the database and hands
+    it back to ``populate``; if a writer invalidated any key in the meantime
+    the fetched value may predate that write, so it is returned uncached.
+    """
+
+    def __init__(self, maxsize, ttl):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): The maximum number of entries.
+            ttl (float): Seconds an entry stays valid.
+        """
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.invalidations = 0
+
+    def invalidate(self, key):
+        """
+        Drop a key and mark reads in flight as possibly stale.
+
+        Args:
+            key: The cache key to drop.
+        """
+        self.invalidations += 1
+        self.pop(key, None)
+
+    def populate(self, key, value, seen):
+        """
+        Cache a freshly fetched value unless it may be stale.
+
+        An entry already present is kept, since it was written through by an
+        update that finished after this read started.
+
+        Args:
+            key: The cache key.
+            value: The fetched value.
+            seen (int): ``invalidations`` as read before the fetch.
+
+        Returns:
+            The value to serve: the cached entry if one exists, else ``value``.
+        """
+        if self.invalidations != seen:
+            return value
+        return self.setdefault(key, value)
+
+
+# str(user_id) -> True for users recently confirmed to exist
+user_exists_cache: ReadCache = ReadCache(
+    maxsize=USER_EXISTS_CACHE_MAXSIZE, ttl=USER_EXISTS_CACHE_TTL
+)
+
+# ObjectId -> user response data
+user_cache: ReadCache = ReadCache(maxsize=READ_CACHE_MAXSIZE, ttl=READ_CACHE_TTL)
+
+# (str(user_id), credential ObjectId) -> credential response data
+credential_cache: ReadCache = ReadCache(maxsize=READ_CACHE_MAXSIZE, ttl=READ_CACHE_TTL)
+
+
+def evict_user_credentials(user_id):
+    """
+    Drop every cached credential owned by a user.
+
+    Args:
+        user_id (ObjectId | str): The ID of the owning user.
+    """
+    owner = str(user_id)
+    for key in [key for key in credential_cache if key[0] == owner]:
+        credential_cache.invalidate(key)
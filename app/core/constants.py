@@ -6,6 +6,7 @@ including field mappings, sort types, search types, and validation fields.
 """
 
 import os
+from typing import Literal
 
 from dotenv import load_dotenv
 
@@ -18,18 +19,39 @@ ID_MAP = {
 }
 ID_FIELD = "id"
 MONGO_ID_FIELD = "_id"
-SORT_TYPE_ASC = "asc"
-SORT_TYPE_DESC = "desc"
+SortType = Literal["asc", "desc"]
+SORT_TYPE_ASC: SortType = "asc"
+SORT_TYPE_DESC: SortType = "desc"
 SORT_BY_FIELD = "sort_by"
 SORT_TYPE_FIELD = "sort_type"
 SEARCH_BY_FIELD = "search_by"
 SEARCH_VALUE_FIELD = "search_value"
-VALIDATION_FIELDS = User.__dict__["__annotations__"].keys()
+VALIDATION_FIELDS = frozenset(User.model_fields)
+USER_FILTER_FIELDS = VALIDATION_FIELDS | {ID_FIELD}
+# Shared predicate for live (not soft-deleted) documents; never mutate it.
+# Queries must keep it so the planner can pick the partial indexes built on it
+LIVE_FILTER = {"is_deleted": False}
+# Fields users can be sorted by; each has an index in init_user_indexes
+USER_SORT_FIELDS = (ID_FIELD, "username", "name", "email_id", "date_of_birth")
 
 SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 0)
 REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 100))
 RATE_LIMIT_OTHER = int(os.getenv("RATE_LIMIT_OTHER", 40))
 RATE_LIMIT_POST = int(os.getenv("RATE_LIMIT_POST", 2))
 WINDOW = int(os.getenv("WINDOW", 60))
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", 10000))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", 30))
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 100))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+CREDENTIAL_PAGE_LIMIT = int(os.getenv("CREDENTIAL_PAGE_LIMIT", 100))
+MAX_CREDENTIAL_PAGE_LIMIT = int(os.getenv("MAX_CREDENTIAL_PAGE_LIMIT", 500))
+USER_EXISTS_CACHE_MAXSIZE = int(os.getenv("USER_EXISTS_CACHE_MAXSIZE", 10000))
+USER_EXISTS_CACHE_TTL = int(os.getenv("USER_EXISTS_CACHE_TTL", 2))
+READ_CACHE_MAXSIZE = int(os.getenv("READ_CACHE_MAXSIZE", 10000))
+READ_CACHE_TTL = int(os.getenv("READ_CACHE_TTL", 30))
+USER_PAGE_LIMIT = int(os.getenv("USER_PAGE_LIMIT", 50))
+MAX_USER_PAGE_LIMIT = int(os.getenv("MAX_USER_PAGE_LIMIT", 500))
+OBJECT_ID_CACHE_MAXSIZE = int(os.getenv("OBJECT_ID_CACHE_MAXSIZE", 10000))
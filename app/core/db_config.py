@@ -8,22 +8,47 @@ the database instance for the application.
 import os
 
 from dotenv import load_dotenv
-from pymongo.mongo_client import MongoClient
+from pymongo import AsyncMongoClient
 from pymongo.server_api import ServerApi
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+# Async operations do not hold a thread while waiting on the server, so a
+# modest pool per worker covers many concurrent requests
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 5))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2500))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 3000)
+)
+
+# Create a new async client; connections are opened lazily on first use, so
+# each worker builds its own pool after the fork
+client: AsyncMongoClient = AsyncMongoClient(
+    MONGO_URI,
+    server_api=ServerApi("1"),
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
 
-# Create a new client and connect to the server
-client = MongoClient(MONGO_URI, server_api=ServerApi("1"))
+db = client.user_management_db
 
-# Ping the admin database to confirm connection
-try:
-    client.admin.command("ping")
-    print("Successfully connected to MongoDB Atlas!")
-except Exception as e:
-    print(e)
 
-db = client.user_management_db
+async def ping_database():
+    """
+    Ping the admin database to confirm the connection.
+
+    Failures are printed rather than raised so the application can still
+    start while MongoDB is unreachable.
+    """
+    try:
+        await client.admin.command("ping")
+        print("Successfully connected to MongoDB Atlas!")
+    except Exception as e:
+        print(e)
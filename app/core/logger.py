@@ -1,6 +1,5 @@
 import logging
 import os
-import sys
 
 from dotenv import load_dotenv
 
@@ -8,6 +7,8 @@ from app.core.middleware import get_transaction_id
 
 load_dotenv()
 
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
 
 class TransactionIdInjecter(logging.Filter):
     def filter(self, record):
@@ -15,34 +16,33 @@ class TransactionIdInjecter(logging.Filter):
         return True
 
 
-class CustomLogger:
-    def __init__(self, name=__name__):
-        self.logger = logging.getLogger(name)
-        self.logger.handlers.clear()
-        level = os.environ.get("LOG_LEVEL", "INFO").upper()
-        handler = logging.StreamHandler(
-            sys.stdout if os.environ.get("LOG_STREAM_STDOUT", False) else None
-        )
-        handler.setLevel(level)
-        handler.addFilter(TransactionIdInjecter())
-        formatter = logging.Formatter(
-            "%(asctime)s - %(transaction_id)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(level)
-
-    def debug(self, message):
-        self.logger.debug(message)
-
-    def info(self, message):
-        self.logger.info(message)
-
-    def warn(self, message):
-        self.logger.warning(message)
-
-    def error(self, message):
-        self.logger.error(message)
-
-    def exception(self, message):
-        self.logger.exception(message)
+# Configured once at startup; modules log through logging.getLogger(__name__),
+# which places them under the "app" logger below.
+LOGGING_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "transaction_id": {"()": TransactionIdInjecter},
+    },
+    "formatters": {
+        "default": {
+            "format": "%(asctime)s - %(transaction_id)s - %(name)s - %(levelname)s - %(message)s"
+        },
+    },
+    "handlers": {
+        "default": {
+            "class": "logging.StreamHandler",
+            "stream": (
+                "ext://sys.stdout"
+                if os.environ.get("LOG_STREAM_STDOUT", False)
+                else "ext://sys.stderr"
+            ),
+            "level": LOG_LEVEL,
+            "filters": ["transaction_id"],
+            "formatter": "default",
+        },
+    },
+    "loggers": {
+        "app": {"handlers": ["default"], "level": LOG_LEVEL, "propagate": False},
+    },
+}
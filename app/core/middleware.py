@@ -1,15 +1,29 @@
+import logging
 import uuid
 from contextvars import ContextVar
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.auth.security import verify_token
 from app.core.constants import RATE_LIMIT_OTHER, RATE_LIMIT_POST, WINDOW
 
+logger = logging.getLogger(__name__)
+
 transaction_id_var = ContextVar("transaction_id", default=None)
 
+# Increment the counter, start the window on the first hit and report the
+# remaining TTL, all in a single atomic round trip.
+RATE_LIMIT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return {count, redis.call('TTL', KEYS[1])}
+"""
+
 
 def get_transaction_id():
     return transaction_id_var.get() or "no-transaction"
@@ -22,6 +36,34 @@ def set_transaction_id(transaction_id=None):
     return transaction_id
 
 
+class UnhandledErrorMiddleware(BaseHTTPMiddleware):
+    """
+    Turn any exception not handled by a route into a 500 response.
+
+    Registered innermost, so the response still passes back through the
+    CORS, transaction id and rate limit middlewares. An app-level
+    exception_handler(Exception) would instead run in ServerErrorMiddleware,
+    outside all of them.
+
+    Driver errors were already logged with their traceback by the repository
+    that raised them, so only other errors are logged here. The client gets a
+    fixed detail rather than the exception text, which can carry driver or
+    connection internals.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as exc:
+            if not isinstance(exc, PyMongoError):
+                logger.exception(
+                    "Unhandled error on %s %s", request.method, request.url.path
+                )
+            return JSONResponse(
+                status_code=500, content={"detail": "Internal Server Error"}
+            )
+
+
 class TransactionIdMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
@@ -36,24 +78,21 @@ class TransactionIdMiddleware(BaseHTTPMiddleware):
 class RateLimitMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next):
-        redis = request.app.state.redis
+        rate_limit_script = request.app.state.rate_limit_script
         token = request.headers.get("Authorization", "").replace("Bearer ", "")
         if token:
             user_payload = verify_token(token)
             if not user_payload:
                 return await call_next(request)
+            # Hand the verified payload to JWTBearer so it is not decoded twice
+            request.state.jwt_payload = user_payload
             rate_limit_identifier = user_payload.get("id")
         else:
             rate_limit_identifier = request.client.host
         RATE_LIMIT = RATE_LIMIT_POST if request.method == "POST" else RATE_LIMIT_OTHER
         redis_key = f"ratelimit:{rate_limit_identifier}"
-        current_count = await redis.get(redis_key)
-        if current_count is None:
-            await redis.set(redis_key, 1, ex=WINDOW)
-        elif int(current_count) < RATE_LIMIT:
-            await redis.incr(redis_key)
-        else:
-            ttl = await redis.ttl(redis_key)
+        current_count, ttl = await rate_limit_script(keys=[redis_key], args=[WINDOW])
+        if int(current_count) > RATE_LIMIT:
             return JSONResponse(
                 status_code=429,
                 content={"error": f"Rate limit exceeded, retry in {ttl} seconds"},
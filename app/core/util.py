@@ -2,50 +2,94 @@
 Utility functions module.
 
 This module contains utility functions used throughout the application
-for parameter processing and other common operations.
+for application startup and shutdown and other common operations.
 """
 
+import logging
+import logging.config
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-from fastapi import FastAPI
+import anyio.to_thread
+import bson
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from redis import asyncio as aioredis  # type: ignore[import]
 
+from app.auth.security import shutdown_password_executor, warm_up_password_context
 from app.core.constants import (
-    ID_FIELD,
+    OBJECT_ID_CACHE_MAXSIZE,
+    REDIS_MAX_CONNECTIONS,
     REDIS_URL,
-    SORT_BY_FIELD,
-    SORT_TYPE_ASC,
-    SORT_TYPE_FIELD,
+    THREADPOOL_SIZE,
 )
+from app.core.db_config import client, ping_database
+from app.core.logger import LOGGING_CONFIG
+from app.core.middleware import RATE_LIMIT_SCRIPT
+from app.models.credentialModel import init_credential_indexes
+from app.models.user import init_user_indexes
 
+logger = logging.getLogger(__name__)
 
-def get_params(params):
+# ObjectIds are immutable, so parsed values can be shared between requests
+_parse_object_id = lru_cache(maxsize=OBJECT_ID_CACHE_MAXSIZE)(ObjectId)
+
+
+def to_object_id(value: str | ObjectId) -> ObjectId:
     """
-    Extract and process query parameters for sorting and filtering.
+    Convert a string ID from the request into an ObjectId.
 
-    This function extracts sort_by and sort_type parameters from the query params
-    and returns them along with the remaining filter parameters.
+    Values that are already ObjectIds are returned as is, and recently seen
+    strings are served from an LRU cache instead of being parsed again.
 
     Args:
-        params (dict): Dictionary containing query parameters.
+        value (str | ObjectId): The hex string ID, or an ObjectId.
 
     Returns:
-        tuple: A tuple containing (sort_by, sort_type, filter_params) where:
-            - sort_by (str): The field to sort by (defaults to 'id')
-            - sort_type (str): The sort order (defaults to 'asc')
-            - filter_params (dict): Remaining parameters for filtering
+        ObjectId: The parsed ID.
+
+    Raises:
+        HTTPException(400): If the value is not a valid ObjectId.
     """
-    sort_by = params.get(SORT_BY_FIELD, ID_FIELD)
-    sort_type = params.get(SORT_TYPE_FIELD, SORT_TYPE_ASC)
-    params.pop(SORT_BY_FIELD, None)
-    params.pop(SORT_TYPE_FIELD, None)
-    return sort_by, sort_type, params
+    if isinstance(value, ObjectId):
+        return value
+    # ObjectId(None) generates a fresh id, which the cache would then pin,
+    # so only strings may reach it
+    if not isinstance(value, str):
+        raise HTTPException(status_code=400, detail=f"Invalid id: {value}")
+    try:
+        return _parse_object_id(value)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid id: {value}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.redis = await aioredis.from_url(REDIS_URL, decode_responses=True)
+    # Configured here rather than at import so it runs once per worker start
+    logging.config.dictConfig(LOGGING_CONFIG)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    await ping_database()
+    if not bson.has_c():
+        logger.warning(
+            "bson C extension is unavailable; documents are encoded in pure Python"
+        )
+    await init_user_indexes()
+    await init_credential_indexes()
+    try:
+        await run_in_threadpool(warm_up_password_context)
+    except Exception:
+        # Only a latency optimisation; the first hash loads the backend instead
+        logger.exception("Password hashing warm-up failed")
+    # One pooled client per worker, shared by every request
+    app.state.redis = await aioredis.from_url(
+        REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, decode_responses=True
+    )
+    app.state.rate_limit_script = app.state.redis.register_script(RATE_LIMIT_SCRIPT)
     print("start:", app.state.redis)
     yield
     print("end:", app.state.redis)
     await app.state.redis.close()
+    await client.close()
+    shutdown_password_executor()
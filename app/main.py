@@ -8,9 +8,14 @@ and includes all the API routers.
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api import credential, users
-from app.core.middleware import RateLimitMiddleware, TransactionIdMiddleware
+from app.core.middleware import (
+    RateLimitMiddleware,
+    TransactionIdMiddleware,
+    UnhandledErrorMiddleware,
+)
 from app.core.util import lifespan
 
 load_dotenv()
@@ -20,7 +25,10 @@ app = FastAPI(
     description="A FastAPI application for user management with JWT authentication",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
+# Added first so it is the innermost middleware
+app.add_middleware(UnhandledErrorMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,5 +38,6 @@ app.add_middleware(
 app.add_middleware(TransactionIdMiddleware)
 app.add_middleware(RateLimitMiddleware)
 
+
 app.include_router(users.router, prefix="/api/users")
 app.include_router(credential.router, prefix="/api/credential")
@@ -1,6 +1,99 @@
+from time import time
+
+from pymongo import ASCENDING, IndexModel
+
+from app.core.constants import LIVE_FILTER
 from app.core.db_config import db
 
 credential_collection = db.get_collection("credential_data")
+# One document per applied data migration, keyed by migration name
+migration_collection = db.get_collection("migrations")
+
+SEARCH_FIELDS_MIGRATION = "credential_search_fields"
+
+# Fields returned to clients; _id is included by default
+CREDENTIAL_PROJECTION = {
+    "title": 1,
+    "username": 1,
+    "password": 1,
+    "url": 1,
+    "notes": 1,
+}
+
+
+async def init_credential_indexes():
+    """
+    Create the indexes backing the credential lookup and listing queries.
+
+    Every credential query filters on user_id and is_deleted, so they lead
+    each index, followed by the field the query sorts or matches on. All of
+    them are partial on live documents so soft-deleted credentials do not
+    take up space in them.
+
+    Credentials stored before the lowercased search fields existed are
+    backfilled first so prefix search keeps finding them.
+    """
+    await backfill_search_fields()
+    await credential_collection.create_indexes(
+        [
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("is_deleted", ASCENDING),
+                    ("_id", ASCENDING),
+                ],
+                partialFilterExpression=LIVE_FILTER,
+            ),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("is_deleted", ASCENDING),
+                    ("title", ASCENDING),
+                ],
+                partialFilterExpression=LIVE_FILTER,
+            ),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("is_deleted", ASCENDING),
+                    ("title_lc", ASCENDING),
+                ],
+                partialFilterExpression=LIVE_FILTER,
+            ),
+            IndexModel(
+                [
+                    ("user_id", ASCENDING),
+                    ("is_deleted", ASCENDING),
+                    ("username_lc", ASCENDING),
+                ],
+                partialFilterExpression=LIVE_FILTER,
+            ),
+        ]
+    )
+
+
+async def backfill_search_fields():
+    """
+    Add title_lc and username_lc to credentials stored without them.
+
+    The backfill scans the whole collection, so it runs once: a marker in
+    the migrations collection, looked up by _id, makes later starts skip it.
+    Each field is backfilled on its own so a document missing only one of
+    them still gets it. Workers racing on the first start both apply the
+    same idempotent updates.
+    """
+    if await migration_collection.find_one({"_id": SEARCH_FIELDS_MIGRATION}):
+        return
+    for field, source in (("title_lc", "$title"), ("username_lc", "$username")):
+        await credential_collection.update_many(
+            {field: {"$exists": False}},
+            [{"$set": {field: {"$toLower": source}}}],
+        )
+    await migration_collection.update_one(
+        {"_id": SEARCH_FIELDS_MIGRATION},
+        {"$set": {"applied_at": int(time())}},
+        upsert=True,
+    )
 
 
 def credential_data(user_id, credential):
@@ -8,6 +101,8 @@ def credential_data(user_id, credential):
         "user_id": user_id,
         "title": credential.title,
         "username": credential.username,
+        "title_lc": credential.title.lower(),
+        "username_lc": credential.username.lower(),
         "password": credential.password,
         "url": credential.url,
         "notes": credential.notes,
@@ -19,11 +114,11 @@ def credential_data(user_id, credential):
 
 def credential_data_update(credential):
     return {
-        "title": credential.title,
-        "username": credential.username,
-        "password": credential.password,
-        "url": credential.url,
-        "notes": credential.notes,
+        **credential.model_dump(
+            exclude_unset=True, exclude={"is_deleted", "created_at", "updated_at"}
+        ),
+        "title_lc": credential.title.lower(),
+        "username_lc": credential.username.lower(),
         "updated_at": credential.updated_at,
     }
 
@@ -44,4 +139,4 @@ def credential_data_response(credential):
 
 
 def all_credential(credentials):
-    return [credential_data_response(credential) for credential in credentials]
+    return list(map(credential_data_response, credentials))
@@ -5,10 +5,60 @@ This module provides functions for converting user documents between
 database format and API response format.
 """
 
+import logging
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.constants import ID_MAP, LIVE_FILTER, USER_SORT_FIELDS
 from app.core.db_config import db
 
+logger = logging.getLogger(__name__)
+
 user_collection = db.get_collection("user_data")
 
+# Fields returned to clients; _id is included by default
+USER_PROJECTION = {
+    "username": 1,
+    "name": 1,
+    "email_id": 1,
+    "date_of_birth": 1,
+}
+
+# Login also needs the stored hash to verify against
+LOGIN_PROJECTION = {**USER_PROJECTION, "password": 1}
+
+
+async def init_user_indexes():
+    """
+    Create the indexes backing the user lookups and the sorted user listing.
+
+    There is one (is_deleted, field) index per allowed sort field, which also
+    serves the exact-match lookups by username and email. All of them are
+    partial on live documents, matching the is_deleted=False filter every
+    user query applies. Live usernames are also kept unique, so a username
+    freed by a soft delete can be taken again.
+    """
+    await user_collection.create_indexes(
+        [
+            IndexModel(
+                [("is_deleted", ASCENDING), (ID_MAP.get(field, field), ASCENDING)],
+                partialFilterExpression=LIVE_FILTER,
+            )
+            for field in USER_SORT_FIELDS
+        ]
+    )
+    try:
+        await user_collection.create_index(
+            [("username", ASCENDING)],
+            unique=True,
+            partialFilterExpression=LIVE_FILTER,
+        )
+    except OperationFailure as e:
+        # Live duplicates left from before the index block the build; signup
+        # still rejects duplicates through its own pre-check
+        logger.warning("Unique username index was not created: %s", e)
+
 
 def user_data(user):
     """
@@ -44,4 +94,4 @@ def all_user(users):
     Returns:
         list: A list of dictionaries, each representing a user.
     """
-    return [user_data(user) for user in users]
+    return list(map(user_data, users))
@@ -1,13 +1,21 @@
-from app.core.logger import CustomLogger
+import logging
+import re
+from time import time
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.core.cache import credential_cache
+from app.core.constants import CREDENTIAL_PAGE_LIMIT
 from app.models.credentialModel import (
+    CREDENTIAL_PROJECTION,
     all_credential,
-    credential_collection,
     credential_data,
     credential_data_response,
     credential_data_update,
 )
 
-logger = CustomLogger("credential_repository")
+logger = logging.getLogger(__name__)
 
 
 class CredentialRepository:
@@ -15,24 +23,30 @@ class CredentialRepository:
     CRUD operations handler for managing user credentials in the database.
 
     This class provides methods to create, read, update, and soft-delete
-    credentials associated with a specific user.
+    credentials associated with a specific user. Credentials store their
+    owner's ID as a hex string, so the user ObjectId passed to each method
+    is converted before it reaches a query.
     """
 
-    def __init__(self):
+    def __init__(self, credential_collection):
         """
         Initialize the CredentialCrud instance with the credential collection
         and data formatting utilities.
+
+        Args:
+            credential_collection (AsyncCollection): The shared credential
+                collection handle.
         """
         self.credential_collection = credential_collection
         self.all_credential = all_credential
         self.credential_data_response = credential_data_response
 
-    def create_credential(self, user_id, credential):
+    async def create_credential(self, user_id, credential):
         """
         Create a new credential for a specific user.
 
         Args:
-            user_id (str): The ID of the user to associate the credential with.
+            user_id (ObjectId): The ID of the user to associate the credential with.
             credential (dict): The credential data to insert.
 
         Returns:
@@ -42,23 +56,25 @@ class CredentialRepository:
             Exception: If an error occurs during the database insertion.
         """
         try:
-            response = credential_collection.insert_one(
-                credential_data(user_id, credential)
+            response = await self.credential_collection.insert_one(
+                credential_data(str(user_id), credential)
             )
             logger.info(
-                f"Credential created successfully for user_id: {user_id}, credential data: {credential_data(user_id, credential)}, credential id: {response.inserted_id}"
+                "Credential created successfully for user_id: %s, credential id: %s",
+                user_id,
+                response.inserted_id,
             )
             return str(response.inserted_id)
-        except Exception as e:
-            logger.error(f"Error occurred while creating credential: {e}")
+        except PyMongoError:
+            logger.exception("Error occurred while creating credential")
             raise
 
-    def get_credential(self, user_id, credential_query):
+    async def get_credential(self, user_id, credential_query):
         """
         Retrieve a single credential for a user that matches the given query.
 
         Args:
-            user_id (str): The ID of the user whose credential is being retrieved.
+            user_id (ObjectId): The ID of the user whose credential is being retrieved.
             credential_query (dict): Additional query parameters to filter the credential.
 
         Returns:
@@ -68,104 +84,176 @@ class CredentialRepository:
             Exception: If an error occurs during the database query.
         """
         try:
-            response = credential_collection.find_one(
-                {**credential_query, "user_id": user_id, "is_deleted": False}
+            response = await self.credential_collection.find_one(
+                {**credential_query, "user_id": str(user_id), "is_deleted": False},
+                CREDENTIAL_PROJECTION,
             )
             logger.info(
-                f"Credential fetched successfully for user_id: {user_id}, credential query: {credential_query}"
+                "Credential fetched successfully for user_id: %s, credential query: %s",
+                user_id,
+                credential_query,
             )
             return self.credential_data_response(response)
-        except Exception as e:
-            logger.error(f"Error occurred while getting credential: {e}")
+        except PyMongoError:
+            logger.exception("Error occurred while getting credential")
+            raise
+
+    async def get_credentials_by_ids(self, user_id, credential_ids):
+        """
+        Retrieve several non-deleted credentials of a user in a single query.
+
+        Args:
+            user_id (ObjectId): The ID of the user who owns the credentials.
+            credential_ids (list): The ObjectIds of the credentials to fetch.
+
+        Returns:
+            list: The matching credentials formatted for response, in no
+                particular order.
+
+        Raises:
+            Exception: If an error occurs during the database query.
+        """
+        try:
+            response = await self.credential_collection.find(
+                {
+                    "_id": {"$in": credential_ids},
+                    "user_id": str(user_id),
+                    "is_deleted": False,
+                },
+                CREDENTIAL_PROJECTION,
+            ).to_list(length=len(credential_ids))
+            logger.info(
+                "Credentials fetched successfully for user_id: %s, requested: %s, found: %s",
+                user_id,
+                len(credential_ids),
+                len(response),
+            )
+            return self.all_credential(response)
+        except PyMongoError:
+            logger.exception("Error occurred while getting credentials by ids")
             raise
 
-    def get_all_credentials(self, user_id, search_value=None):
+    async def get_all_credentials(
+        self, user_id, search_value=None, limit=CREDENTIAL_PAGE_LIMIT, after=None
+    ):
         """
-        Retrieve all non-deleted credentials for a specific user.
+        Retrieve a page of non-deleted credentials for a specific user.
+
+        Results are ordered by ``_id`` so the last ID of a page can be passed
+        back as ``after`` to fetch the next one.
 
         Args:
-            user_id (str): The ID of the user whose credentials are being retrieved.
+            user_id (ObjectId): The ID of the user whose credentials are being retrieved.
             search_value (str): The value to search for in the credentials.
+            limit (int): The maximum number of credentials to return.
+            after (ObjectId): Only return credentials with an ID greater than this.
 
         Returns:
-            list: A list of all credential data formatted for response.
+            list: A list of credential data formatted for response.
 
         Raises:
             Exception: If an error occurs during the database query.
         """
         try:
-            search_query = {"user_id": user_id, "is_deleted": False}
+            search_query = {"user_id": str(user_id), "is_deleted": False}
+            if after:
+                search_query["_id"] = {"$gt": after}
 
             def get_filter_query(value):
-                return {
-                    "$or": [
-                        {"title": {"$regex": f"^{value}", "$options": "i"}},
-                        {"username": {"$regex": f"^{value}", "$options": "i"}},
-                    ]
-                }
+                # Case-sensitive anchored prefix on the lowercased copies so
+                # each branch of the $or is an index range scan
+                prefix = {"$regex": f"^{re.escape(value.lower())}"}
+                return {"$or": [{"title_lc": prefix}, {"username_lc": prefix}]}
 
             if search_value:
                 search_query.update(get_filter_query(search_value))
-            response = credential_collection.find(search_query)
+            response = (
+                await self.credential_collection.find(
+                    search_query, CREDENTIAL_PROJECTION
+                )
+                .sort("_id", ASCENDING)
+                .limit(limit)
+                .to_list(length=limit)
+            )
             logger.info(
-                f"All credentials fetched successfully for user_id: {user_id}, search value: {search_value}, credential count: {response.count()}"
+                "All credentials fetched successfully for user_id: %s, search value: %s, credential count: %s",
+                user_id,
+                search_value,
+                len(response),
             )
             return self.all_credential(response)
-        except Exception as e:
-            logger.error(f"Error occurred while getting all credentials: {e}")
+        except PyMongoError:
+            logger.exception("Error occurred while getting all credentials")
             raise
 
-    def update_credential(self, user_id, credential_id, credential):
+    async def update_credential(self, user_id, credential_id, credential):
         """
         Update an existing credential for a user.
 
         Args:
-            user_id (str): The ID of the user who owns the credential.
+            user_id (ObjectId): The ID of the user who owns the credential.
             credential_id (ObjectId): The ID of the credential to update.
             credential (dict): The updated credential data.
 
         Returns:
-            UpdateResult: The result of the update operation.
+            dict: The updated credential formatted for response, or None if no
+                live credential matched.
 
         Raises:
             Exception: If an error occurs during the update.
         """
         try:
-            response = credential_collection.update_one(
-                {"_id": credential_id, "user_id": user_id},
+            response = await self.credential_collection.find_one_and_update(
+                {"_id": credential_id, "user_id": str(user_id), "is_deleted": False},
                 {"$set": credential_data_update(credential)},
+                projection=CREDENTIAL_PROJECTION,
+                return_document=ReturnDocument.AFTER,
             )
+            # Write through rather than evict, so a read that started before
+            # the update cannot put the old document back
+            key = (str(user_id), credential_id)
+            credential_data = self.credential_data_response(response)
+            if credential_data:
+                credential_cache[key] = credential_data
+            else:
+                credential_cache.invalidate(key)
             logger.info(
-                f"Credential updated successfully for user_id: {user_id}, credential id: {credential_id}, credential data: {credential_data_update(credential)}"
+                "Credential updated successfully for user_id: %s, credential id: %s",
+                user_id,
+                credential_id,
             )
-            return response
-        except Exception as e:
-            logger.error(f"Error occurred while updating credential: {e}")
+            return credential_data
+        except PyMongoError:
+            logger.exception("Error occurred while updating credential")
             raise
 
-    def delete_credential(self, user_id, credential_id):
+    async def delete_credential(self, user_id, credential_id):
         """
         Soft delete a credential by marking it as deleted.
 
         Args:
-            user_id (str): The ID of the user who owns the credential.
+            user_id (ObjectId): The ID of the user who owns the credential.
             credential_id (ObjectId): The ID of the credential to delete.
 
         Returns:
-            UpdateResult: The result of the update operation.
+            UpdateResult: The result of the update operation; matched_count
+                is 0 when no live credential matched.
 
         Raises:
             Exception: If an error occurs during the deletion process.
         """
         try:
-            response = credential_collection.update_one(
-                {"_id": credential_id, "user_id": user_id},
-                {"$set": {"is_deleted": True}},
+            response = await self.credential_collection.update_one(
+                {"_id": credential_id, "user_id": str(user_id), "is_deleted": False},
+                {"$set": {"is_deleted": True, "deleted_at": int(time())}},
             )
+            credential_cache.invalidate((str(user_id), credential_id))
             logger.info(
-                f"Credential deleted successfully for user_id: {user_id}, credential id: {credential_id}"
+                "Credential deleted successfully for user_id: %s, credential id: %s",
+                user_id,
+                credential_id,
             )
             return response
-        except Exception as e:
-            logger.error(f"Error occurred while deleting credential: {e}")
+        except PyMongoError:
+            logger.exception("Error occurred while deleting credential")
             raise
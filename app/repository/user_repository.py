@@ -5,12 +5,18 @@ This module provides the UserCrud class for handling all database
 operations related to user management including create, read, update, and delete.
 """
 
-from datetime import datetime
+import asyncio
+import logging
+from time import time
 
-from app.core.logger import CustomLogger
-from app.models.user import all_user, user_collection
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
-logger = CustomLogger("user_repository")
+from app.core.cache import evict_user_credentials, user_cache, user_exists_cache
+from app.core.constants import LIVE_FILTER, USER_PAGE_LIMIT
+from app.models.user import USER_PROJECTION, all_user, user_data
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository:
@@ -21,19 +27,27 @@ class UserRepository:
     create, read, update, and delete operations.
     """
 
-    def __init__(self):
+    def __init__(self, user_collection, credential_collection):
         """
         Initialize the UserCrud class with database collections.
+
+        Args:
+            user_collection (AsyncCollection): The shared user collection handle.
+            credential_collection (AsyncCollection): The shared credential
+                collection handle, used to cascade user deletes.
         """
         self.user_collection = user_collection
+        self.credential_collection = credential_collection
         self.all_user = all_user
 
-    def get_user(self, **user_details):
+    async def get_user(self, user_details, projection=None):
         """
         Retrieve a user from the database matching the given details.
 
         Args:
-            **user_details: Arbitrary keyword arguments representing user fields.
+            user_details (dict): The user fields to match.
+            projection (dict, optional): Fields to return; the full document
+                is returned when omitted.
 
         Returns:
             dict: The user document if found, else None.
@@ -42,14 +56,16 @@ class UserRepository:
             Exception: If an error occurs during database query.
         """
         try:
-            user = self.user_collection.find_one({**user_details, "is_deleted": False})
-            logger.info(f"User successfully fetched for user details: {user_details}")
+            user = await self.user_collection.find_one(
+                user_details | LIVE_FILTER, projection
+            )
+            logger.info("User successfully fetched for user details: %s", user_details)
             return user
-        except Exception as e:
-            logger.error(f"Error occur while getting user by id: {e}")
+        except PyMongoError:
+            logger.exception("Error occur while getting user by id")
             raise
 
-    def create_user(self, user):
+    async def create_user(self, user):
         """
         Create a new user in the database.
 
@@ -60,39 +76,65 @@ class UserRepository:
             str: The ID of the newly created user.
 
         Raises:
+            DuplicateKeyError: If the username is taken by a live user.
             Exception: If an error occurs during user creation.
         """
         try:
-            response = self.user_collection.insert_one(user)
+            response = await self.user_collection.insert_one(user)
             logger.info(
-                f"User created successfully for user id: {str(response.inserted_id)}"
+                "User created successfully for user id: %s", response.inserted_id
             )
             return str(response.inserted_id)
-        except Exception as e:
-            logger.error(f"Error occure while creating user: {e}")
+        except DuplicateKeyError:
+            raise
+        except PyMongoError:
+            logger.exception("Error occure while creating user")
             raise
 
-    def get_users(self, sort_by, sort_order, filter_params):
+    async def get_users(
+        self, sort_by, sort_order, filter_params, skip=0, limit=USER_PAGE_LIMIT
+    ):
         """
-        Retrieve all users from the database with sorting and filtering.
+        Retrieve a page of users from the database with sorting and filtering.
 
         Args:
             sort_by (str): The field to sort by.
             sort_order (int): The sort order (1 for ascending, -1 for descending).
             filter_params (dict): The filter parameters to apply.
+            skip (int): The number of matching users to skip.
+            limit (int): The maximum number of users to return.
 
         Returns:
             list: List of user documents matching the criteria.
+
+        Raises:
+            Exception: If an error occurs during database query.
         """
-        users = self.user_collection.find({"is_deleted": False, **filter_params}).sort(
-            sort_by, sort_order
-        )
+        try:
+            users = (
+                await self.user_collection.find(
+                    filter_params | LIVE_FILTER, USER_PROJECTION
+                )
+                .sort(sort_by, sort_order)
+                .skip(skip)
+                .limit(limit)
+                .to_list(length=limit)
+            )
+        except PyMongoError:
+            logger.exception("Error occur while getting users")
+            raise
         logger.info(
-            f"Users fetched successfully for params: {sort_by}, {sort_order}, {filter_params}, user count: {users.count()}"
+            "Users fetched successfully for params: %s, %s, %s, skip: %s, limit: %s, user count: %s",
+            sort_by,
+            sort_order,
+            filter_params,
+            skip,
+            limit,
+            len(users),
         )
         return self.all_user(users)
 
-    def get_user_by_id(self, id):
+    async def get_user_by_id(self, id):
         """
         Retrieve a user by their ID.
 
@@ -102,52 +144,100 @@ class UserRepository:
         Returns:
             dict: The user document if found, else None.
         """
-        return self.get_user(**{"_id": id})
+        return await self.get_user({"_id": id}, USER_PROJECTION)
 
-    def update_user_by_id(self, id, user):
+    async def update_user_by_id(self, id, user):
         """
         Update a user's information by their ID.
 
         Args:
             id (str): The user's ID.
-            user (dict): The updated user data.
+            user (UpdateUser): The updated user data; only the fields the
+                client sent are written, and is_deleted is never taken from
+                it since deletes must go through delete_user_by_id.
 
         Returns:
-            UpdateResult: The result of the update operation.
+            dict: The updated user data, or an empty dict if no live user
+                matched.
 
         Raises:
+            DuplicateKeyError: If the new username is taken by a live user.
             Exception: If an error occurs during the update.
         """
         try:
-            user.updated_at = int(datetime.timestamp(datetime.now()))
-            user_data = dict(user)
-
-            response = self.user_collection.update_one({"_id": id}, {"$set": user_data})
+            update = {
+                **user.model_dump(
+                    exclude_unset=True, exclude={"is_deleted", "updated_at"}
+                ),
+                "updated_at": int(time()),
+            }
+
+            response = user_data(
+                await self.user_collection.find_one_and_update(
+                    {"_id": id, "is_deleted": False},
+                    {"$set": update},
+                    projection=USER_PROJECTION,
+                    return_document=ReturnDocument.AFTER,
+                )
+            )
+            # Write through rather than evict, so a read that started before
+            # the update cannot put the old document back
+            if response:
+                user_cache[id] = response
+            else:
+                user_exists_cache.invalidate(str(id))
+                user_cache.invalidate(id)
             logger.info(
-                f"User successfully updated for user id: {id}, updated user data: {user_data}"
+                "User successfully updated for user id: %s, updated user data: %s",
+                id,
+                update,
             )
             return response
-        except Exception as e:
-            logger.error(f"Error occur while updating user by id: {e}")
+        except DuplicateKeyError:
+            raise
+        except PyMongoError:
+            logger.exception("Error occur while updating user by id")
             raise
 
-    def delete_user_by_id(self, id):
+    async def delete_user_by_id(self, id):
         """
-        Mark a user as deleted by setting is_deleted flag to True.
+        Mark a user and all of their credentials as deleted.
+
+        The user and credential soft-deletes are issued concurrently, so the
+        cascade costs one round trip however many credentials the user owns.
 
         Args:
-            id (str): The user's ID.
+            id (ObjectId): The user's ID.
 
         Returns:
-            UpdateResult: The result of the soft delete operation.
+            UpdateResult: The result of the user soft delete operation;
+                matched_count is 0 when no live user matched.
 
         Raises:
             Exception: If an error occurs during the deletion.
         """
         try:
-            response = self.update_user_by_id(id, {"is_deleted": True})
-            logger.info(f"User successfully deleted for user id: {id}")
+            now = int(time())
+            deleted = {
+                "$set": {"is_deleted": True, "updated_at": now, "deleted_at": now}
+            }
+            response, credentials = await asyncio.gather(
+                self.user_collection.update_one(
+                    {"_id": id, "is_deleted": False}, deleted
+                ),
+                self.credential_collection.update_many(
+                    {"user_id": str(id), "is_deleted": False}, deleted
+                ),
+            )
+            user_exists_cache.invalidate(str(id))
+            user_cache.invalidate(id)
+            evict_user_credentials(id)
+            logger.info(
+                "User successfully deleted for user id: %s, credentials deleted: %s",
+                id,
+                credentials.modified_count,
+            )
             return response
-        except Exception as e:
-            logger.error(f"Error occur while deleting user by id: {e}")
+        except PyMongoError:
+            logger.exception("Error occur while deleting user by id")
             raise
@@ -1,6 +1,6 @@
-from datetime import datetime
+from time import time
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Credential(BaseModel):
@@ -10,8 +10,8 @@ class Credential(BaseModel):
     url: str = ""
     notes: str = ""
     is_deleted: bool = False
-    created_at: int = int(datetime.timestamp(datetime.now()))
-    updated_at: int = int(datetime.timestamp(datetime.now()))
+    created_at: int = Field(default_factory=lambda: int(time()))
+    updated_at: int = Field(default_factory=lambda: int(time()))
 
 
 class UpdateCredential(BaseModel):
@@ -21,7 +21,7 @@ class UpdateCredential(BaseModel):
     url: str = ""
     notes: str = ""
     is_deleted: bool = False
-    updated_at: int = int(datetime.timestamp(datetime.now()))
+    updated_at: int = Field(default_factory=lambda: int(time()))
 
 
 class CredentialResponse(BaseModel):
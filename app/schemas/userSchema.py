@@ -5,9 +5,9 @@ This module contains Pydantic models for user data validation,
 including User, UpdateUser, and UserLogin models.
 """
 
-from datetime import datetime
+from time import time
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 
 class User(BaseModel):
@@ -24,8 +24,8 @@ class User(BaseModel):
     email_id: str
     date_of_birth: str
     is_deleted: bool = False
-    created_at: int = int(datetime.timestamp(datetime.now()))
-    updated_at: int = int(datetime.timestamp(datetime.now()))
+    created_at: int = Field(default_factory=lambda: int(time()))
+    updated_at: int = Field(default_factory=lambda: int(time()))
 
     @field_validator("password")
     @classmethod
@@ -60,7 +60,7 @@ class UpdateUser(BaseModel):
     email_id: str
     date_of_birth: str
     is_deleted: bool = False
-    updated_at: int = int(datetime.timestamp(datetime.now()))
+    updated_at: int = Field(default_factory=lambda: int(time()))
 
 
 class UserLogin(BaseModel):
@@ -1,11 +1,17 @@
-from bson.objectid import ObjectId
+import logging
+from functools import lru_cache
+
 from fastapi import HTTPException
 
-from app.core.logger import CustomLogger
+from app.core.cache import credential_cache, user_exists_cache
+from app.core.constants import CREDENTIAL_PAGE_LIMIT
+from app.core.util import to_object_id
+from app.models.credentialModel import credential_collection
 from app.repository.credential_repository import CredentialRepository
-from app.repository.user_repository import UserRepository
+from app.services.user_service import user_repository
 
-logger = CustomLogger("credential_service")
+logger = logging.getLogger(__name__)
+credential_repository = CredentialRepository(credential_collection)
 
 
 class CredentialService:
@@ -13,193 +19,210 @@ class CredentialService:
     Service layer for managing user credentials.
 
     This class acts as a business logic layer, connecting the CRUD operations
-    for credentials and users. It ensures validation, existence checks,
-    and ID conversions before interacting with the database.
+    for credentials and users. The owning user is authorised and checked once
+    per request by the router's authorized_user_id dependency (through
+    get_user_data), so the credential methods take the already validated
+    user ObjectId.
+
+    Listings deliberately do not join credentials to their owner with a
+    $lookup pipeline. Credentials store user_id as a hex string, so joining
+    on the users' ObjectId _id needs a per-document conversion that cannot
+    use an index. An empty page is also a valid answer for an existing user,
+    so it cannot stand in for a 404. No endpoint lists credentials across
+    users, so there is no bulk loader either.
     """
 
     def __init__(self):
         """
-        Initialize the CredentialService with instances of
-        CredentialCrud and UserCrud for data operations.
+        Initialize the CredentialService with the process-wide CredentialCrud
+        and the UserCrud shared with the user service.
         """
-        self.credential_repository = CredentialRepository()
-        self.user_repository = UserRepository()
+        self.credential_repository = credential_repository
+        self.user_repository = user_repository
 
-    def create_credential(self, user_id, credential):
+    async def create_credential(self, user_id, credential):
         """
-        Create a credential for a given user after validating the user exists.
+        Create a credential for a given user.
 
         Args:
-            user_id (str): The ID of the user.
+            user_id (ObjectId): The ID of the user.
             credential (dict): The credential data to create.
 
         Returns:
             str: The ID of the created credential.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            return self.credential_repository.create_credential(user_id, credential)
-        except Exception as e:
-            logger.error(f"Error occurred while creating credential: {e}")
-            raise
+        return await self.credential_repository.create_credential(user_id, credential)
 
-    def get_credential_by_id(self, user_id, credential_id):
+    async def get_credential_by_id(self, user_id, credential_id):
         """
         Retrieve a credential by its ID for a specific user.
 
+        Found credentials are cached for READ_CACHE_TTL seconds.
+
         Args:
-            user_id (str): The ID of the user.
-            credential_id (str): The ID of the credential.
+            user_id (ObjectId): The ID of the user.
+            credential_id (ObjectId): The ID of the credential.
 
         Returns:
             dict: The credential data, or None if not found.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            credential_id = ObjectId(credential_id)
-            credential_data = self.credential_repository.get_credential(
-                user_id, {"_id": credential_id}
-            )
-            return credential_data
-        except Exception as e:
-            logger.error(f"Error occurred while getting credential: {e}")
-            raise
+        key = (str(user_id), credential_id)
+        if key in credential_cache:
+            return credential_cache[key]
+        seen = credential_cache.invalidations
+        credential_data = await self.credential_repository.get_credential(
+            user_id, {"_id": credential_id}
+        )
+        if credential_data:
+            credential_data = credential_cache.populate(key, credential_data, seen)
+        return credential_data
 
-    def get_credential_by_title(self, user_id, title):
+    async def get_credential_by_title(self, user_id, title):
         """
         Retrieve a credential by its title for a specific user.
 
         Args:
-            user_id (str): The ID of the user.
+            user_id (ObjectId): The ID of the user.
             title (str): The title of the credential.
 
         Returns:
             dict: The credential data, or None if not found.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            credential_data = self.credential_repository.get_credential(
-                user_id, {"title": title}
-            )
-            return credential_data
-        except Exception as e:
-            logger.error(f"Error occurred while getting credential by title: {e}")
-            raise
+        return await self.credential_repository.get_credential(
+            user_id, {"title": title}
+        )
 
-    def get_all_credentials(self, user_id, search_value=None):
+    async def get_credentials_by_ids(self, user_id, credential_ids):
         """
-        Retrieve all credentials for a specific user.
+        Retrieve several credentials of a user by ID in one round trip.
 
         Args:
-            user_id (str): The ID of the user.
+            user_id (ObjectId): The ID of the user.
+            credential_ids (list): The credential IDs, as strings or ObjectIds.
+
+        Returns:
+            list: The credentials in the order requested, with None for IDs
+                that do not match a live credential of the user.
+
+        Raises:
+            HTTPException(400): If any ID is malformed.
+            Exception: For any database or processing errors.
+        """
+        credential_ids = list(map(to_object_id, credential_ids))
+        if not credential_ids:
+            return []
+        credentials = await self.credential_repository.get_credentials_by_ids(
+            user_id, credential_ids
+        )
+        found = {credential["id"]: credential for credential in credentials}
+        return [found.get(str(credential_id)) for credential_id in credential_ids]
+
+    async def get_all_credentials(
+        self, user_id, search_value=None, limit=CREDENTIAL_PAGE_LIMIT, after=None
+    ):
+        """
+        Retrieve a page of credentials for a specific user.
+
+        Args:
+            user_id (ObjectId): The ID of the user.
             search_value (str): The value to search for in the credentials.
+            limit (int): The maximum number of credentials to return.
+            after (ObjectId): The ID of the last credential of the previous page.
+
         Returns:
-            list: A list of all credentials for the user.
+            list: A list of credentials for the user.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            return self.credential_repository.get_all_credentials(user_id, search_value)
-        except Exception as e:
-            logger.error(f"Error occurred while getting all credentials: {e}")
-            raise
+        return await self.credential_repository.get_all_credentials(
+            user_id, search_value, limit, after
+        )
 
-    def update_credential(self, user_id, credential_id, credential):
+    async def update_credential(self, user_id, credential_id, credential):
         """
         Update a credential for a specific user.
 
         Args:
-            user_id (str): The ID of the user.
-            credential_id (str): The ID of the credential to update.
+            user_id (ObjectId): The ID of the user.
+            credential_id (ObjectId): The ID of the credential to update.
             credential (dict): The updated credential data.
 
         Returns:
-            UpdateResult or None: The update operation result, or None if the credential does not exist.
+            dict or None: The updated credential data, or None if the credential does not exist.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            credential_id = ObjectId(credential_id)
-            credential_data = self.credential_repository.get_credential(
-                user_id, {"_id": credential_id}
-            )
-            if not credential_data:
-                return None
-            return self.credential_repository.update_credential(
-                user_id, credential_id, credential
-            )
-        except Exception as e:
-            logger.error(f"Error occurred while updating credential: {e}")
-            raise
+        return await self.credential_repository.update_credential(
+            user_id, credential_id, credential
+        )
 
-    def delete_credential(self, user_id, credential_id):
+    async def delete_credential(self, user_id, credential_id):
         """
         Soft delete a credential for a specific user.
 
         Args:
-            user_id (str): The ID of the user.
-            credential_id (str): The ID of the credential to delete.
+            user_id (ObjectId): The ID of the user.
+            credential_id (ObjectId): The ID of the credential to delete.
 
         Returns:
             UpdateResult or None: The deletion operation result, or None if the credential does not exist.
 
         Raises:
-            HTTPException: If the user does not exist.
             Exception: For any database or processing errors.
         """
-        try:
-            self.get_user_data(user_id)
-            credential_id = ObjectId(credential_id)
-            credential_data = self.credential_repository.get_credential(
-                user_id, {"_id": credential_id}
-            )
-            if not credential_data:
-                return None
-            return self.credential_repository.delete_credential(user_id, credential_id)
-        except Exception as e:
-            logger.error(f"Error occurred while deleting credential: {e}")
-            raise
+        response = await self.credential_repository.delete_credential(
+            user_id, credential_id
+        )
+        return response if response.matched_count else None
 
-    def get_user_data(self, user_id):
+    async def get_user_data(self, user_id):
         """
-        Validate and retrieve user data by ID.
+        Validate that a user exists by ID.
+
+        Users confirmed to exist are remembered for a short while so the
+        credential endpoints do not hit the database on every request.
 
         Args:
-            user_id (str): The ID of the user to retrieve.
+            user_id (str): The ID of the user to check.
 
         Returns:
-            dict: The user data.
+            dict: A minimal document holding the user's ``_id``.
 
         Raises:
-            HTTPException: If the user is not found.
+            HTTPException: If the ID is malformed or the user is not found.
             Exception: For any database or processing errors.
         """
-        try:
-            user_id = ObjectId(user_id)
-            user_data = self.user_repository.get_user(**{"_id": user_id})
-            if not user_data:
-                raise HTTPException(
-                    status_code=404, detail=f"User not found for user_id: {user_id}"
-                )
-            return user_data
-        except Exception as e:
-            logger.error(f"Error occurred while checking if user is found: {e}")
-            raise
+        user_id = to_object_id(user_id)
+        key = str(user_id)
+        if key in user_exists_cache:
+            return {"_id": user_id}
+        seen = user_exists_cache.invalidations
+        user_data = await self.user_repository.get_user({"_id": user_id}, {"_id": 1})
+        if not user_data:
+            raise HTTPException(
+                status_code=404, detail=f"User not found for user_id: {user_id}"
+            )
+        user_exists_cache.populate(key, True, seen)
+        return user_data
+
+
+@lru_cache
+def get_credential_service() -> CredentialService:
+    """
+    Return the shared CredentialService, creating it on first use.
+
+    Returns:
+        CredentialService: The process-wide credential service instance.
+    """
+    return CredentialService()
@@ -5,26 +5,39 @@ This module provides the UserService class and utility functions for
 user management business logic and operations.
 """
 
-from bson.objectid import ObjectId
-from fastapi import HTTPException
+import logging
+from functools import lru_cache
 
-from app.auth.security import hash_password
-from app.core.constants import ID_FIELD, ID_MAP, MONGO_ID_FIELD, VALIDATION_FIELDS
-from app.core.logger import CustomLogger
-from app.models.user import user_data
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app.auth.security import hash_password_async
+from app.core.cache import user_cache
+from app.core.constants import (
+    ID_FIELD,
+    ID_MAP,
+    USER_FILTER_FIELDS,
+    USER_PAGE_LIMIT,
+    USER_SORT_FIELDS,
+)
+from app.core.util import to_object_id
+from app.models.credentialModel import credential_collection
+from app.models.user import user_collection, user_data
 from app.repository.user_repository import UserRepository
 from app.schemas.userSchema import User
 
-logger = CustomLogger("user_service")
-user_repository = UserRepository()
+logger = logging.getLogger(__name__)
+user_repository = UserRepository(user_collection, credential_collection)
 
 
-def get_user(**user_details):
+async def get_user(user_details, projection=None):
     """
     Retrieve a user from the database matching the given details.
 
     Args:
-        **user_details: Arbitrary keyword arguments representing user fields.
+        user_details (dict): The user fields to match.
+        projection (dict, optional): Fields to return; the full document
+            is returned when omitted.
 
     Returns:
         dict: The user document if found, else None.
@@ -32,14 +45,10 @@ def get_user(**user_details):
     Raises:
         Exception: If an error occurs during database query.
     """
-    try:
-        return user_repository.get_user(**user_details)
-    except Exception as e:
-        logger.error(f"Error occur while getting user by id: {e}")
-        raise
+    return await user_repository.get_user(user_details, projection)
 
 
-def is_duplicate_username(user: User):
+async def is_duplicate_username(user: User):
     """
     Check if the username already exists in the database.
 
@@ -52,7 +61,11 @@ def is_duplicate_username(user: User):
     Raises:
         HTTPException: If the username already exists.
     """
-    existing_user = user_repository.get_user(**{"username": user.username})
+    # Only indexed fields are read, so the (is_deleted, username) index
+    # answers this without fetching the document
+    existing_user = await user_repository.get_user(
+        {"username": user.username}, {"_id": 0, "username": 1}
+    )
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     return user
@@ -66,7 +79,7 @@ class UserService:
     def __init__(self):
         self.user_repository = user_repository
 
-    def create_user(self, user: User):
+    async def create_user(self, user: User):
         """
         Create a new user in the database.
 
@@ -77,44 +90,67 @@ class UserService:
             str: The inserted user's ID.
 
         Raises:
+            HTTPException(400): If the username is already taken.
             Exception: If an error occurs during user creation.
         """
+        hashed = await hash_password_async(user.password)
+        user = user.model_copy(update={"password": hashed})
         try:
-            user.password = hash_password(user.password)
-            response = self.user_repository.create_user(dict(user))
-            return response
-        except Exception as e:
-            logger.error(f"Error occure while creating user: {e}")
-            raise
-
-    def get_users(self, sort_by, sort_order, filter_params):
+            return await self.user_repository.create_user(
+                user.model_dump(exclude_none=True)
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Username already exists")
+
+    async def get_users(
+        self, sort_by, sort_order, filter_params, skip=0, limit=USER_PAGE_LIMIT
+    ):
         """
-        Retrieve all non-deleted users from the database.
+        Retrieve a page of non-deleted users from the database.
+
+        Args:
+            sort_by (str): The field to sort by; must be one of USER_SORT_FIELDS.
+            sort_order (str): The sort order, "asc" or "desc".
+            filter_params (dict): Exact-match filters keyed by user field.
+            skip (int): The number of matching users to skip.
+            limit (int): The maximum number of users to return.
 
         Returns:
             list: List of user documents.
+
+        Raises:
+            HTTPException(400): If the sort or filter fields are not allowed,
+                or the id filter is not a valid ObjectId.
         """
-        if sort_by not in VALIDATION_FIELDS and sort_by != ID_FIELD:
+        if sort_by not in USER_SORT_FIELDS:
             raise HTTPException(
                 status_code=400, detail=f"Invalid sort_by field: {sort_by}"
             )
-        if not all(key in VALIDATION_FIELDS for key in filter_params.keys()):
+        if not filter_params.keys() <= USER_FILTER_FIELDS:
             raise HTTPException(
                 status_code=400, detail=f"Invalid filter fields: {filter_params.keys()}"
             )
         sort_order = 1 if "asc" == sort_order else -1
-        if ID_FIELD in filter_params:
-            filter_params[MONGO_ID_FIELD] = ObjectId(filter_params[ID_FIELD])
-            del filter_params[ID_FIELD]
-        users = self.user_repository.get_users(
-            ID_MAP.get(sort_by, sort_by), sort_order, filter_params
+        # Translate API field names to document fields without touching the
+        # caller's dict; the ?id= filter arrives as a hex string and must be
+        # an ObjectId to match _id
+        mongo_filter = {
+            ID_MAP.get(field, field): (
+                to_object_id(value) if field == ID_FIELD else value
+            )
+            for field, value in filter_params.items()
+        }
+        users = await self.user_repository.get_users(
+            ID_MAP.get(sort_by, sort_by), sort_order, mongo_filter, skip, limit
         )
         return users
 
-    def get_user_by_id(self, id):
+    async def get_user_by_id(self, id):
         """
         Retrieve a user by their ID.
 
+        Found users are cached for READ_CACHE_TTL seconds.
+
         Args:
             id (str): The user's ID.
 
@@ -122,17 +158,19 @@ class UserService:
             dict: The user data if found.
 
         Raises:
+            HTTPException(400): If the ID is malformed.
             Exception: If an error occurs during retrieval.
         """
-        try:
-            user_id = ObjectId(id)
-            user = self.user_repository.get_user_by_id(user_id)
-            return user_data(user)
-        except Exception as e:
-            logger.error(f"Error occur while getting user by id: {e}")
-            raise
-
-    def update_user_by_id(self, id, user):
+        user_id = to_object_id(id)
+        if user_id in user_cache:
+            return user_cache[user_id]
+        seen = user_cache.invalidations
+        user = user_data(await self.user_repository.get_user_by_id(user_id))
+        if user:
+            user = user_cache.populate(user_id, user, seen)
+        return user
+
+    async def update_user_by_id(self, id, user):
         """
         Update a user's information by their ID.
 
@@ -141,23 +179,21 @@ class UserService:
             user (User): The updated user object.
 
         Returns:
-            dict or None: The update response or None if user not found.
+            dict or None: The updated user data or None if user not found.
 
         Raises:
+            HTTPException(400): If the ID is malformed or the new username
+                is already taken.
             Exception: If an error occurs during update.
         """
+        user_id = to_object_id(id)
         try:
-            user_id = ObjectId(id)
-            user_data = self.user_repository.get_user(**{"_id": user_id})
-            if not user_data:
-                return user_data
-            response = self.user_repository.update_user_by_id(user_id, user)
-            return response
-        except Exception as e:
-            logger.error(f"Error occur while updating user by id: {e}")
-            raise
-
-    def delete_user_by_id(self, id: str):
+            response = await self.user_repository.update_user_by_id(user_id, user)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Username already exists")
+        return response or None
+
+    async def delete_user_by_id(self, id: str):
         """
         Mark a user as deleted by their ID.
 
@@ -168,15 +204,20 @@ class UserService:
             dict or None: The update response or None if user not found.
 
         Raises:
+            HTTPException(400): If the ID is malformed.
             Exception: If an error occurs during deletion.
         """
-        try:
-            user_id = ObjectId(id)
-            user_data = self.user_repository.get_user(**{"_id": user_id})
-            if not user_data:
-                return user_data
-            response = self.user_repository.delete_user_by_id(user_id)
-            return response
-        except Exception as e:
-            logger.error(f"Error occur while deleteing user by id: {e}")
-            raise
+        user_id = to_object_id(id)
+        response = await self.user_repository.delete_user_by_id(user_id)
+        return response if response.matched_count else None
+
+
+@lru_cache
+def get_user_service() -> UserService:
+    """
+    Return the shared UserService, creating it on first use.
+
+    Returns:
+        UserService: The process-wide user service instance.
+    """
+    return UserService()
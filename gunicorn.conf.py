@@ -0,0 +1,15 @@
+"""
+Gunicorn configuration for running the API under Uvicorn workers.
+
+The app is I/O bound, so the worker count follows the usual 2 * CPUs + 1
+rule unless WEB_CONCURRENCY overrides it. preload_app imports the
+application once in the master so forked workers share the loaded modules.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True